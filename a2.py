@@ -4,19 +4,23 @@
 # In[243]:
 
 
-# No imports allowed besides these.
-from collections import Counter, defaultdict
-from itertools import chain, combinations
+# matplotlib, scipy and sklearn are imported inside the functions that
+# use them, so importing this module for tokenize or scoring stays cheap.
+import argparse
+from collections import Counter, defaultdict, deque
+import csv
+from itertools import chain, combinations, islice
 import glob
-import matplotlib.pyplot as plt
+import json
+import multiprocessing
 import numpy as np
 import os
+import pickle
 import re
-from scipy.sparse import csr_matrix
-from sklearn.model_selection import KFold
-from sklearn.linear_model import LogisticRegression
 import string
+import sys
 import tarfile
+import time
 import urllib.request
 
 
@@ -278,6 +282,7 @@ def vectorize(tokens_list, feature_fns, min_freq, vocab=None):
     >>> sorted(vocab.items(), key=lambda x: x[1])
     [('token=great', 0), ('token=horrible', 1), ('token=isn', 2), ('token=movie', 3), ('token=t', 4), ('token=this', 5)]
     """
+    from scipy.sparse import csr_matrix
    
     
     row = []
@@ -356,6 +361,7 @@ def cross_validation_accuracy(clf, X, labels, k):
       The average testing accuracy of the classifier
       over each fold of cross-validation.
     """
+    from sklearn.model_selection import KFold
     cv = KFold(n_splits = k, shuffle = False, random_state = 42)
     accuracies = []
     for train_ind, test_ind in cv.split(X):
@@ -397,17 +403,21 @@ def eval_all_combinations(docs, labels, punct_vals,
                     (e.g., [2,5,10])
 
     Returns:
-      A list of dicts, one per combination. Each dict has
-      four keys:
+      A results array (see results_dtype), one row per combination.
+      Each row has four fields:
       'punct': True or False, the setting of keep_internal_punct
-      'features': The list of functions used to compute features.
+      'features': The names of the functions used to compute features
+                  (see features_to_names).
       'min_freq': The setting of the min_freq parameter.
       'accuracy': The average cross_validation accuracy for this setting, using 5 folds.
 
-      This list should be SORTED in descending order of accuracy.
+      This array is SORTED in descending order of accuracy (see
+      sort_results). Use result_setting to turn a row back into a
+      setting for fit_best_classifier.
 
       This function will take a bit longer to run (~20s for me).
     """
+    from sklearn.linear_model import LogisticRegression
    
     combi_dict=[]
     False_tokens=[]
@@ -439,30 +449,173 @@ def eval_all_combinations(docs, labels, punct_vals,
                     tokens = True_tokens
                 X,y=vectorize(tokens, function, min_freq=freq)
                 accuracy = cross_validation_accuracy(LogisticRegression(),X,labels,5)
-                result = {'punct':punct , 'features':function, 'min_freq':freq, 'accuracy':accuracy}
-                combi_dict.append(result)
+                combi_dict.append((punct, features_to_names(function), freq, accuracy))
 
 
-    return sorted(combi_dict, key=lambda x:(x['accuracy'],x['min_freq']), reverse=True)
+    width = max([len(r[1]) for r in combi_dict], default=1)
+    return sort_results(np.array(combi_dict, dtype=results_dtype(width)))
     pass
 
 
 # In[ ]:
 
 
-def plot_sorted_accuracies(results):
+def results_dtype(width=1):
+    """
+    The dtype of a results array: one row per classifier setting,
+    with the feature functions stored by name so that the array
+    can be saved and compared across runs.
+
+    Params:
+      width...number of characters reserved for the feature names.
+    """
+    return np.dtype([('punct', np.bool_), ('features', 'U%d' % max(width, 1)),
+                     ('min_freq', np.int64), ('accuracy', np.float64)])
+
+
+def results_to_array(results):
+    """
+    Convert a list of setting dicts (with keys 'punct', 'features',
+    'min_freq' and 'accuracy') into a structured numpy array (see
+    results_dtype). Arrays are returned unchanged if their fields
+    match results_dtype; otherwise a ValueError is raised.
+
+    The 'features' column holds the space-separated names of the
+    feature functions, e.g. 'token_features lexicon_features'.
+
+    >>> arr = results_to_array([{'punct': True, 'features': (token_features, lexicon_features), 'min_freq': 2, 'accuracy': .75}])
+    >>> arr[0].tolist()
+    (True, 'token_features lexicon_features', 2, 0.75)
+    >>> results_to_array(arr[['accuracy', 'punct']])
+    Traceback (most recent call last):
+    ...
+    ValueError: not a results array: expected fields ('punct', 'features', 'min_freq', 'accuracy'), got ('accuracy', 'punct')
+    """
+    if isinstance(results, np.ndarray):
+        if results.dtype.names != results_dtype().names:
+            raise ValueError('not a results array: expected fields %s, got %s'
+                             % (results_dtype().names, results.dtype.names))
+        return results
+    names = [features_to_names(r['features']) for r in results]
+    arr = np.empty(len(results), dtype=results_dtype(max(map(len, names), default=1)))
+    arr['punct'] = [r['punct'] for r in results]
+    arr['features'] = names
+    arr['min_freq'] = [r['min_freq'] for r in results]
+    arr['accuracy'] = [r['accuracy'] for r in results]
+    return arr
+
+
+def sort_results(results):
+    """
+    Sort a results array descending by accuracy, then by min_freq.
+    The sort is stable, so rows that tie keep their original order.
+    """
+    return results[np.lexsort((-results['min_freq'], -results['accuracy']))]
+
+
+def merge_results(*arrays):
+    """
+    Merge results arrays from several runs or worker processes
+    into a single sorted array.
+
+    Params:
+      arrays...results arrays (or lists of setting dicts).
+    Returns:
+      one results array, sorted as by sort_results. Empty if no
+      arrays are given.
+    """
+    if not arrays:
+        return np.empty(0, dtype=results_dtype())
+    arrays = [results_to_array(a) for a in arrays]
+    width = max([a.dtype['features'].itemsize // 4 for a in arrays], default=1)
+    dtype = results_dtype(width)
+    return sort_results(np.concatenate([a.astype(dtype) for a in arrays]))
+
+
+def result_setting(row, feature_fns=None):
+    """
+    Turn one row of a results array into a setting dict, with the
+    feature functions looked up by name, as accepted by
+    fit_best_classifier, parse_test_data and save_model.
+
+    Params:
+      row...........one row of a results array.
+      feature_fns...the feature functions that were swept, as a list or
+                    a dict from name to function. Defaults to the
+                    functions defined in this module.
+
+    >>> arr = results_to_array([{'punct': True, 'features': (token_features,), 'min_freq': 2, 'accuracy': .75}])
+    >>> setting = result_setting(arr[0])
+    >>> setting['punct'], [f.__name__ for f in setting['features']], setting['min_freq']
+    (True, ['token_features'], 2)
+
+    Feature functions defined elsewhere must be passed in:
+    >>> def my_feats(tokens, feats):
+    ...     feats['n_tokens'] = len(tokens)
+    >>> arr = results_to_array([{'punct': False, 'features': (my_feats, lexicon_features), 'min_freq': 5, 'accuracy': .7}])
+    >>> setting = result_setting(arr[0], [my_feats, lexicon_features])
+    >>> setting['features'] == (my_feats, lexicon_features)
+    True
+    """
+    return {'punct': bool(row['punct']),
+            'features': features_from_names(str(row['features']), feature_fns),
+            'min_freq': int(row['min_freq']),
+            'accuracy': float(row['accuracy'])}
+
+
+def save_results(path, results):
+    """
+    Save results to path in .npy format, without pickling.
+    """
+    np.save(path, results_to_array(results), allow_pickle=False)
+
+
+def load_results(path):
+    """
+    Load results saved by save_results.
+    """
+    return results_to_array(np.load(path, allow_pickle=False))
+
+
+def group_mean(results, field, value='accuracy'):
+    """
+    Group a results array by one column and average another.
+
+    Params:
+      results...results array.
+      field.....column to group by, e.g. 'min_freq'.
+      value.....column to average ('accuracy' by default).
+    Returns:
+      keys......the distinct values of field, in order of first appearance.
+      means.....the mean of value for each key.
+      counts....the number of rows for each key.
+    """
+    keys, first, inverse, counts = np.unique(results[field], return_index=True,
+                                             return_inverse=True, return_counts=True)
+    sums = np.bincount(inverse.ravel(), weights=results[value], minlength=len(keys))
+    order = np.argsort(first, kind='stable')
+    return keys[order], (sums / counts)[order], counts[order]
+
+
+# In[ ]:
+
+
+def plot_sorted_accuracies(results, path='accuracies.png'):
     """
     Plot all accuracies from the result of eval_all_combinations
-    in ascending order of accuracy.
-    Save to "accuracies.png".
-    """
-    accuracy = []
-    for i in range(0,len(results)):
-        accuracy.append(results[i]['accuracy'])
-    plt.plot(sorted(accuracy))
-    plt.xlabel("settings")
-    plt.ylabel("accuracy")
-    plt.savefig('accuracies.png')
+    (or a list of setting dicts) in ascending order of accuracy.
+    Save to path ("accuracies.png" by default).
+    Draws on a standalone Figure, so no display is needed and the
+    pyplot backend and state are left untouched.
+    """
+    from matplotlib.figure import Figure
+    accuracy = np.sort(results_to_array(results)['accuracy'])
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.plot(accuracy)
+    ax.set_xlabel("settings")
+    ax.set_ylabel("accuracy")
+    fig.savefig(path)
     pass
 
 
@@ -477,35 +630,18 @@ def mean_accuracy_per_setting(results):
     min_freq=2.
 
     Params:
-      results...The output of eval_all_combinations
+      results...The output of eval_all_combinations, or a list of
+                setting dicts (see results_to_array)
     Returns:
       A list of (accuracy, setting) tuples, SORTED in
       descending order of accuracy.
     """
-    features = defaultdict(lambda: [0,0])
-    freq = defaultdict(lambda: [0,0])
-    punt = defaultdict(lambda: [0,0])
-    for i in results:
-        f_n = ''
-        for f in i ['features']:
-            f_n += ' '+f.__name__
-        e_f = features[f_n]
-        e_f[0] +=  i['accuracy']
-        e_f[1] += 1
-        e_fr = freq[(i['min_freq'])]
-        e_fr[0] +=  i['accuracy']
-        e_fr[1] += 1
-        e_p = punt[(i['punct'])]
-        e_p[0] +=  i['accuracy']
-        e_p[1] += 1
-
-    avg_feat = [(float(v[0]) / v[1],'features:'+str(k)) for
-             k, v in features.items()]
-    avg_freq = [(float(v[0]) / v[1],'min_freq'+str(k)) for
-             k, v in freq.items()]
-    avg_punt = [(float(v[0]) / v[1],'punct'+str(k)) for
-             k, v in punt.items()]
-    l = list(avg_feat)+list(avg_freq)+list(avg_punt)
+    results = results_to_array(results)
+    l = []
+    for field, prefix in [('features', 'features: '), ('min_freq', 'min_freq'),
+                          ('punct', 'punct')]:
+        keys, means, _ = group_mean(results, field)
+        l += [(float(m), prefix + str(k)) for k, m in zip(keys, means)]
 
     return sorted(l,key=lambda x:-x[0])
     pass
@@ -524,13 +660,15 @@ def fit_best_classifier(docs, labels, best_result):
     Params:
       docs..........List of training document strings.
       labels........The true labels for each training document (0 or 1)
-      best_result...Element of eval_all_combinations
-                    with highest accuracy
+      best_result...Setting with highest accuracy, i.e.
+                    result_setting of the first row of
+                    eval_all_combinations
     Returns:
       clf.....A LogisticRegression classifier fit to all
             training data.
       vocab...The dict from feature name to column index.
     """
+    from sklearn.linear_model import LogisticRegression
     tokens = []
     for doc in docs:
         tokens.append(tokenize(doc,best_result['punct']))
@@ -592,8 +730,9 @@ def parse_test_data(best_result, vocab):
     test data.
 
     Params:
-      best_result...Element of eval_all_combinations
-                    with highest accuracy
+      best_result...Setting with highest accuracy, i.e.
+                    result_setting of the first row of
+                    eval_all_combinations
       vocab.........dict from feature name to column index,
                     built from the training data.
     Returns:
@@ -653,13 +792,368 @@ def print_top_misclassified(test_docs, test_labels, X_test, clf, n):
     pass
 
 
+# In[ ]:
+
+
+def features_to_names(feature_fns):
+    """
+    The space-separated names of a sequence of feature functions.
+
+    >>> features_to_names([token_features, lexicon_features])
+    'token_features lexicon_features'
+    """
+    return ' '.join(f.__name__ for f in feature_fns)
+
+
+def features_from_names(names, feature_fns=None):
+    """
+    Look up the feature functions named in a string built by
+    features_to_names.
+
+    Params:
+      names.........space-separated feature function names.
+      feature_fns...functions to look the names up in, as a list or a
+                    dict from name to function. By default only functions
+                    defined in this module are used, so the result does
+                    not depend on which module is __main__.
+    Returns:
+      a tuple of functions.
+
+    >>> [f.__name__ for f in features_from_names('token_features lexicon_features')]
+    ['token_features', 'lexicon_features']
+    """
+    if feature_fns is None:
+        lookup = {k: v for k, v in globals().items()
+                  if callable(v) and getattr(v, '__module__', None) == __name__}
+    elif isinstance(feature_fns, dict):
+        lookup = feature_fns
+    else:
+        lookup = {f.__name__: f for f in feature_fns}
+    fns = []
+    for name in names.split():
+        if name not in lookup:
+            raise ValueError('unknown feature function: %r' % name)
+        fns.append(lookup[name])
+    return tuple(fns)
+
+
+def save_model(path, clf, vocab, best_result):
+    """
+    Save a fitted classifier, its vocabulary and the setting it was
+    trained with, so that it can be reused by score_reviews without
+    re-running eval_all_combinations.
+
+    Params:
+      path..........file to write the pickled model to.
+      clf...........LogisticRegression classifier fit on all training
+                    data.
+      vocab.........dict from feature name to column index.
+      best_result...Setting the classifier was fit with (see
+                    result_setting).
+    Returns:
+      nothing.
+
+    The feature functions are stored by name (see features_to_names),
+    so the model can be loaded by any process that imports this module.
+    Only the classifier's coef_, intercept_ and classes_ arrays are
+    kept, so loading and scoring need neither sklearn nor scipy.
+    """
+    model = {'coef': np.asarray(clf.coef_), 'intercept': np.asarray(clf.intercept_),
+             'classes': np.asarray(clf.classes_), 'vocab': vocab,
+             'punct': best_result['punct'],
+             'features': features_to_names(best_result['features']),
+             'min_freq': best_result['min_freq']}
+    with open(path, 'wb') as f:
+        pickle.dump(model, f)
+
+
+def load_model(path):
+    """
+    Load a model written by save_model.
+
+    Params:
+      path...file the model was pickled to.
+    Returns:
+      a dict with keys 'coef', 'intercept', 'classes', 'vocab', 'punct',
+      'features' and 'min_freq'. 'features' holds the feature function
+      names; score_chunk looks them up with features_from_names.
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+# In[ ]:
+
+
+def iter_reviews(path):
+    """
+    Lazily read reviews from a plain text file (one review per line),
+    a directory in the data/<split>/{pos,neg} layout (or a directory
+    of such splits), or a .tgz archive such as imdb.tgz.
+
+    Reviews are yielded in a deterministic order: line order for
+    text files, sorted path order for directories and archive order
+    for tgz files.
+
+    Params:
+      path...a file, directory or .tgz archive.
+    Returns:
+      a generator of (doc_id, doc) tuples. For text files, blank
+      lines are skipped and doc_id is the (0-based) line number.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'reviews.txt')
+    >>> with open(path, 'w') as f:
+    ...     _ = f.write('A great movie.\\n\\n   \\nWorst film ever.\\n')
+    >>> list(iter_reviews(path))
+    [('0', 'A great movie.'), ('3', 'Worst film ever.')]
+    """
+    if os.path.isdir(path):
+        fnames = sorted(glob.glob(os.path.join(path, '**', '*.txt'), recursive=True))
+        for f in fnames:
+            if os.path.basename(os.path.dirname(f)) in ('pos', 'neg'):
+                with open(f) as fh:
+                    yield os.path.relpath(f, path), fh.readline().rstrip('\n')
+    elif path.endswith(('.tgz', '.tar.gz')):
+        with tarfile.open(path, 'r|gz') as tar:
+            for member in tar:
+                parts = member.name.split('/')
+                if (member.isfile() and member.name.endswith('.txt')
+                        and len(parts) > 1 and parts[-2] in ('pos', 'neg')):
+                    doc = tar.extractfile(member).readline().decode('utf-8')
+                    yield member.name, doc.rstrip('\n')
+    else:
+        with open(path) as fh:
+            for i, line in enumerate(fh):
+                line = line.rstrip('\n')
+                if line.strip():
+                    yield str(i), line
+
+
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most size elements, without
+    reading more than one chunk ahead.
+
+    >>> list(chunked(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    it = iter(iterable)
+    chunk = list(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(it, size))
+
+
+# In[ ]:
+
+
+_worker_model = None
+
+
+def _init_worker(model):
+    """ Keep the model in each worker so it is only sent once. """
+    global _worker_model
+    _worker_model = model
+
+
+def predict_proba(tokens_list, model):
+    """
+    Class probabilities of a LogisticRegression model saved by
+    save_model, computed with numpy only. Features are looked up in
+    the model's vocab (as vectorize does at test time) and multiplied
+    with the coefficients directly, without building a csr_matrix.
+
+    Params:
+      tokens_list...a list of token arrays, one per document.
+      model.........a dict as returned by load_model.
+    Returns:
+      an array of shape (len(tokens_list), len(model['classes'])),
+      matching LogisticRegression.predict_proba for binary and
+      multinomial models.
+    """
+    feature_fns = features_from_names(model['features'])
+    vocab = model['vocab']
+    rows, cols, vals = [], [], []
+    for doc_no, tokens in enumerate(tokens_list):
+        for feat, value in featurize(tokens, feature_fns):
+            if feat in vocab:
+                rows.append(doc_no)
+                cols.append(vocab[feat])
+                vals.append(value)
+    rows, cols, vals = np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(vals, dtype=np.float64)
+    coef = model['coef']
+    scores = np.empty((len(tokens_list), len(coef)))
+    for c in range(len(coef)):
+        scores[:, c] = np.bincount(rows, weights=coef[c, cols] * vals, minlength=len(tokens_list))
+    scores += model['intercept']
+    if len(coef) == 1:
+        # Binary: probability of the positive class is expit(score).
+        pos = np.exp(-np.logaddexp(0, -scores[:, 0]))
+        return np.column_stack([1 - pos, pos])
+    scores -= scores.max(axis=1, keepdims=True)
+    probas = np.exp(scores)
+    return probas / probas.sum(axis=1, keepdims=True)
+
+
+def score_chunk(docs, model=None):
+    """
+    Tokenize, featurize and classify one chunk of documents.
+
+    Params:
+      docs....list of document strings.
+      model...a dict as returned by load_model. If None, the model
+              given to the worker initializer is used.
+    Returns:
+      a tuple (labels, probas): the predicted label of each document
+      and the predicted probability of that label.
+    """
+    if model is None:
+        model = _worker_model
+    tokens = [tokenize(doc, model['punct']) for doc in docs]
+    probas = predict_proba(tokens, model)
+    labels = np.argmax(probas, axis=1)
+    return (model['classes'][labels].tolist(),
+            probas[np.arange(len(labels)), labels].tolist())
+
+
+def score_reviews(reviews, model, chunk_size=1000, n_jobs=1):
+    """
+    Score a stream of reviews in chunks, optionally across several
+    worker processes. At most 2 * n_jobs chunks are in flight at any
+    time, so memory stays bounded regardless of the input size, and
+    results are yielded in input order.
+
+    Params:
+      reviews......iterable of (doc_id, doc) tuples, e.g. from iter_reviews.
+      model........a dict as returned by load_model.
+      chunk_size...number of documents per chunk.
+      n_jobs.......number of worker processes; 1 scores in-process.
+    Returns:
+      a generator of (doc_id, label, probability) tuples.
+
+    >>> model = {'coef': np.array([[-1., 1.]]), 'intercept': np.array([0.]),
+    ...          'classes': np.array([0, 1]), 'vocab': {'neg_words': 0, 'pos_words': 1},
+    ...          'punct': False, 'features': 'lexicon_features', 'min_freq': 1}
+    >>> reviews = [(str(i), doc) for i, doc in enumerate(
+    ...     ['great fun', 'boring', 'just a movie', 'the worst, bad', 'love it'] * 3)]
+    >>> scores = list(score_reviews(reviews, model, chunk_size=2))
+    >>> [(i, label, round(p, 4)) for i, label, p in scores[:5]]
+    [('0', 1, 0.7311), ('1', 0, 0.7311), ('2', 0, 0.5), ('3', 0, 0.8808), ('4', 1, 0.7311)]
+    >>> list(score_reviews(reviews, model, chunk_size=2, n_jobs=2)) == scores
+    True
+    """
+    chunks = chunked(reviews, chunk_size)
+    if n_jobs <= 1:
+        for chunk in chunks:
+            labels, probas = score_chunk([d for _, d in chunk], model)
+            for (doc_id, _), label, proba in zip(chunk, labels, probas):
+                yield doc_id, label, proba
+        return
+
+    pool = multiprocessing.Pool(n_jobs, initializer=_init_worker, initargs=(model,))
+    try:
+        pending = deque()
+        for chunk in chunks:
+            ids = [i for i, _ in chunk]
+            pending.append((ids, pool.apply_async(score_chunk, ([d for _, d in chunk],))))
+            if len(pending) >= 2 * n_jobs:
+                ids, res = pending.popleft()
+                yield from zip(ids, *res.get())
+        while pending:
+            ids, res = pending.popleft()
+            yield from zip(ids, *res.get())
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def write_scores(scores, out, fmt='jsonl'):
+    """
+    Write (doc_id, label, probability) tuples to out as they arrive.
+
+    Params:
+      scores...iterable of (doc_id, label, probability) tuples.
+      out......a writable text file.
+      fmt......'jsonl' or 'csv'.
+    Returns:
+      the number of documents written.
+
+    >>> import io
+    >>> out = io.StringIO()
+    >>> write_scores([('a.txt', 1, 0.9), ('b.txt', 0, 0.6666666)], out, 'csv')
+    2
+    >>> out.getvalue().splitlines()
+    ['id,label,probability', 'a.txt,1,0.900000', 'b.txt,0,0.666667']
+    >>> out = io.StringIO()
+    >>> write_scores([('a.txt', 1, 0.9), ('b.txt', 0, 0.6666666)], out)
+    2
+    >>> out.getvalue().splitlines()
+    ['{"id": "a.txt", "label": 1, "probability": 0.9}', '{"id": "b.txt", "label": 0, "probability": 0.666667}']
+    """
+    n = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['id', 'label', 'probability'])
+    for doc_id, label, proba in scores:
+        if fmt == 'csv':
+            writer.writerow([doc_id, int(label), '%.6f' % proba])
+        else:
+            out.write(json.dumps({'id': doc_id, 'label': int(label),
+                                  'probability': round(float(proba), 6)}) + '\n')
+        n += 1
+    return n
+
+
+def score_main(argv=None):
+    """
+    Command-line batch scorer. See `python a2.py score --help`.
+    """
+    parser = argparse.ArgumentParser(prog='a2.py score',
+                                     description='Score movie reviews with a saved model.')
+    parser.add_argument('source', help='text file (one review per line), '
+                        'data directory or .tgz archive')
+    parser.add_argument('--model', default='model.pkl',
+                        help='model written by main() (default: model.pkl)')
+    parser.add_argument('--output', '-o', default='-',
+                        help='output file (default: stdout)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if not os.path.exists(args.source):
+        parser.error('source not found: %s' % args.source)
+
+    model = load_model(args.model)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    start = time.time()
+    try:
+        n = write_scores(score_reviews(iter_reviews(args.source), model,
+                                       args.chunk_size, args.jobs),
+                         out, args.format)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.time() - start
+    print('scored %d documents in %.2fs (%.1f docs/sec)' %
+          (n, elapsed, n / elapsed if elapsed else 0.), file=sys.stderr)
+
+
 # In[248]:
 
 
-def main():
+def main(model_path='model.pkl', plot=False, results_path='results.npy'):
     """
     Put it all together.
     ALREADY DONE.
+    The best classifier is saved to model_path for use by
+    `python a2.py score`, and all cross-validation results to
+    results_path (see save_results). If plot is True, the sorted
+    accuracies are also saved to accuracies.png.
     """
     feature_fns = [token_features, token_pair_features, lexicon_features]
     # Download and read data.
@@ -672,16 +1166,19 @@ def main():
                                     feature_fns,
                                     [2,5,10])
     # Print information about these results.
-    best_result = results[0]
-    worst_result = results[-1]
+    best_result = result_setting(results[0], feature_fns)
+    worst_result = result_setting(results[-1], feature_fns)
     print('best cross-validation result:\n%s' % str(best_result))
     print('worst cross-validation result:\n%s' % str(worst_result))
-    plot_sorted_accuracies(results)
+    save_results(results_path, results)
+    if plot:
+        plot_sorted_accuracies(results)
     print('\nMean Accuracies per Setting:')
     print('\n'.join(['%s: %.5f' % (s,v) for v,s in mean_accuracy_per_setting(results)]))
 
     # Fit best classifier.
-    clf, vocab = fit_best_classifier(docs, labels, results[0])
+    clf, vocab = fit_best_classifier(docs, labels, best_result)
+    save_model(model_path, clf, vocab, best_result)
 
     # Print top coefficients per class.
     print('\nTOP COEFFICIENTS PER CLASS:')
@@ -703,5 +1200,16 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    if sys.argv[1:2] == ['score']:
+        score_main(sys.argv[2:])
+    else:
+        parser = argparse.ArgumentParser(description='Train and evaluate the review classifier.')
+        parser.add_argument('--model', default='model.pkl',
+                            help='where to save the best classifier (default: model.pkl)')
+        parser.add_argument('--plot', action='store_true',
+                            help='save the sorted accuracies to accuracies.png')
+        parser.add_argument('--results', default='results.npy',
+                            help='where to save all cross-validation results (default: results.npy)')
+        args = parser.parse_args()
+        main(args.model, args.plot, args.results)
 
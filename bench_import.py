@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Import-time benchmark for a2.py.
+
+Each measurement runs in a fresh interpreter, so nothing is cached
+between runs:
+
+  tokenize only.......imports a2 and tokenizes a review. Only numpy
+                      and the stdlib are loaded.
+  prediction worker...loads a small saved model and scores a chunk
+                      with load_model + score_chunk. The model holds
+                      only numpy arrays and score_chunk computes the
+                      probabilities with numpy, so neither sklearn nor
+                      scipy is imported.
+  eager...............the prediction worker, after also importing
+                      matplotlib, scipy and sklearn up front the way
+                      a2.py used to at module level.
+
+These times apply to processes that start fresh, such as workers
+using the spawn start method or separate scoring scripts. Workers
+forked by score_reviews inherit the parent's modules instead; since
+`python a2.py score` no longer imports sklearn or scipy either, the
+saving is paid once in the parent rather than per worker.
+
+    python bench_import.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import a2
+
+
+EAGER = ("import matplotlib.pyplot, scipy.sparse, sklearn.linear_model, "
+         "sklearn.model_selection; ")
+TOKENIZE = "import a2; a2.tokenize(\"Isn't this movie great?\")"
+PREDICT = ("import a2; a2.score_chunk([\"Isn't this movie great?\"], "
+           "a2.load_model(%r))")
+
+
+def make_model(path):
+    """ Fit and save a tiny model for the prediction snippets. """
+    docs = ["a great movie, loved it", "the worst, so boring",
+            "wonderful and amazing", "horrible, i hate it"]
+    setting = {'punct': False, 'features': (a2.token_features, a2.lexicon_features),
+               'min_freq': 1}
+    clf, vocab = a2.fit_best_classifier(docs, np.array([1, 0, 1, 0]), setting)
+    a2.save_model(path, clf, vocab, setting)
+
+
+def time_snippet(code, repeats):
+    """
+    Run code in a fresh interpreter repeats times.
+
+    Returns:
+      list of wall-clock times in milliseconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(repeats=10):
+    """ Print the median startup time of each snippet. """
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        make_model(model_path)
+        snippets = [('tokenize only', TOKENIZE),
+                    ('prediction worker', PREDICT % model_path),
+                    ('eager prediction worker (old layout)', EAGER + PREDICT % model_path)]
+        baseline = np.median(time_snippet('pass', repeats))
+        print('bare interpreter: %.1f ms' % baseline)
+        for name, code in snippets:
+            t = np.median(time_snippet(code, repeats))
+            print('%s: %.1f ms (+%.1f ms over bare interpreter)' % (name, t, t - baseline))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)